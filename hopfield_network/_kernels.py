@@ -0,0 +1,103 @@
+import numpy as np
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    # Numba is optional; without it the kernels run as Python/NumPy
+    HAS_NUMBA = False
+    
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+try:
+    # Optional Cython kernel for N=64; build with: cythonize -i _recall64.pyx
+    from _recall64 import recall_sweep64
+except ImportError:
+    recall_sweep64 = None
+
+
+if HAS_NUMBA:
+    @njit(cache=True, fastmath=True, boundscheck=False)
+    def recall_sweep(W, state):
+        """
+        One asynchronous sweep over all neurons, updating state in place
+        W: contiguous (N, N) weight matrix
+        state: contiguous int8 bipolar state of length N
+        Returns the number of neurons that flipped (0 means the state is stable)
+        """
+        N = state.shape[0]
+        flipped = 0
+        for i in range(N):
+            acc = 0.0
+            row = W[i]
+            for j in range(N):
+                acc += row[j] * state[j]
+            new = 1 if acc >= 0.0 else -1
+            if new != state[i]:
+                state[i] = new
+                flipped += 1
+        return flipped
+else:
+    def recall_sweep(W, state):
+        """
+        One asynchronous sweep over all neurons, updating state in place
+        Without Numba each net input is a row-wise np.dot, which keeps the
+        inner product out of the interpreter
+        Returns the number of neurons that flipped (0 means the state is stable)
+        """
+        # Mirror of state in the weight dtype, so np.dot needs no casting
+        state_w = state.astype(W.dtype)
+        flipped = 0
+        for i in range(state.shape[0]):
+            new = 1 if np.dot(W[i], state_w) >= 0 else -1
+            if new != state[i]:
+                state[i] = new
+                state_w[i] = new
+                flipped += 1
+        return flipped
+
+
+if HAS_NUMBA:
+    @njit(cache=True)
+    def popcount64(x):
+        """Number of set bits in a uint64 (SWAR, compiles to popcnt)"""
+        x = x - ((x >> np.uint64(1)) & np.uint64(0x5555555555555555))
+        x = (x & np.uint64(0x3333333333333333)) + \
+            ((x >> np.uint64(2)) & np.uint64(0x3333333333333333))
+        x = (x + (x >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+        return (x * np.uint64(0x0101010101010101)) >> np.uint64(56)
+else:
+    def popcount64(x):
+        """Number of set bits in a uint64"""
+        return int(x).bit_count()
+
+
+@njit(cache=True)
+def recall_sweep_bin(w_bits, state_bits, valid_bits):
+    """
+    One asynchronous sweep with binarized (sign-only) weights
+    w_bits: uint64 per neuron, bit j set <-> W[i, j] >= 0
+    state_bits: uint64 state, bit j set <-> neuron j is +1
+    valid_bits: uint64 with the low N bits set
+    The net input of neuron i is (#agreeing bits) - (#disagreeing bits)
+    over the other N - 1 neurons, i.e. 2 * popcount(~(w ^ s)) - (N - 1).
+    Returns the new state bits and the number of neurons that flipped
+    """
+    N = w_bits.shape[0]
+    one = np.uint64(1)
+    flipped = 0
+    for i in range(N):
+        bit = one << np.uint64(i)
+        agree = ~(w_bits[i] ^ state_bits) & valid_bits & ~bit
+        net = 2 * np.int64(popcount64(agree)) - (N - 1)
+        if net >= 0:
+            new_bits = state_bits | bit
+        else:
+            new_bits = state_bits & ~bit
+        if new_bits != state_bits:
+            state_bits = new_bits
+            flipped += 1
+    return state_bits, flipped
@@ -1,3 +1,5 @@
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
 import numpy as np
@@ -14,15 +16,42 @@ class HopfieldGUI:
         self.grid_size = 8
         self.cell_size = 40
         
-        # Current pattern (8x8 grid flattened to 64)
-        self.current_pattern = np.zeros(64, dtype=int)
+        # Redraws are coalesced to at most one per redraw_delay ms, and
+        # recall animation shows one history frame per frame_delay ms
+        self.redraw_delay = 16
+        self.frame_delay = 100
+        self._redraw_pending = False
+        
+        # Recall runs on a worker thread; the lock keeps the GUI from
+        # changing the weights underneath it. Until the animation finishes,
+        # edits and network changes are ignored so they can't be lost or
+        # make the summary stale
+        self._network_lock = threading.Lock()
+        self._recall_running = False
+        # The worker never touches Tk; it posts results here and the Tk
+        # thread polls every poll_delay ms
+        self._recall_queue = queue.Queue()
+        self.poll_delay = 10
+        
+        # Current pattern (8x8 grid flattened to 64). When shared it is a
+        # read-only view (of a stored pattern or recall frame) and gets
+        # copied on first edit
+        self.current_pattern = np.zeros(64, dtype=np.uint8)
+        self._current_is_shared = False
         
         # Storage for learned patterns
-        self.stored_patterns = []
+        self.stored_patterns = np.empty((0, 64), dtype=np.uint8)
+        
+        # Warm up the compiled recall kernels (used by the Asynchronous and
+        # Binarized Weights modes) so the first Recall is fast
+        self.network.recall(self.current_pattern, max_iterations=1,
+                            synchronous=False)
+        self.network.recall(self.current_pattern, max_iterations=1,
+                            binarized=True)
         
         # Create GUI components
         self.create_widgets()
-        self.update_display()
+        self.schedule_redraw()
     
     def create_widgets(self):
         # Main frame
@@ -45,6 +74,19 @@ class HopfieldGUI:
         self.canvas.grid(row=0, column=0)
         self.canvas.bind("<Button-1>", self.on_cell_click)
         
+        # One pixel per cell, zoomed into a single canvas image on redraw
+        self.pixels = tk.PhotoImage(width=self.grid_size, height=self.grid_size)
+        self.photo = tk.PhotoImage(width=self.grid_size * self.cell_size,
+                                   height=self.grid_size * self.cell_size)
+        self.canvas.create_image(0, 0, anchor='nw', image=self.photo, tags='grid')
+        
+        # Cell outlines never change, so draw them once on top of the image
+        extent = self.grid_size * self.cell_size
+        for k in range(self.grid_size + 1):
+            offset = k * self.cell_size
+            self.canvas.create_line(offset, 0, offset, extent, fill='gray')
+            self.canvas.create_line(0, offset, extent, offset, fill='gray')
+        
         # Middle panel - Controls
         control_frame = ttk.LabelFrame(main_frame, text="Controls", padding="10")
         control_frame.grid(row=1, column=1, padx=10, sticky=(tk.N))
@@ -67,6 +109,18 @@ class HopfieldGUI:
         ttk.Button(control_frame, text="Add Noise", 
                   command=self.add_noise).grid(row=5, column=0, pady=5, sticky='ew')
         
+        # Recall update mode (exactly one applies):
+        # synchronous - all neurons at once, one matrix-vector product per sweep
+        # asynchronous - one neuron at a time; uses the int8 Cython kernel when
+        #                _recall64 is built, else the Numba kernel
+        # binarized - one neuron at a time with sign-only weights (popcount)
+        self.update_mode_var = tk.StringVar(value='synchronous')
+        for row, (text, mode) in enumerate([("Synchronous", 'synchronous'),
+                                            ("Asynchronous", 'asynchronous'),
+                                            ("Binarized Weights", 'binarized')], start=6):
+            ttk.Radiobutton(control_frame, text=text, value=mode,
+                            variable=self.update_mode_var).grid(row=row, column=0, pady=2, sticky='w')
+        
         # Right panel - Information
         info_frame = ttk.LabelFrame(main_frame, text="Network Info", padding="10")
         info_frame.grid(row=1, column=2, sticky=(tk.N))
@@ -107,42 +161,72 @@ class HopfieldGUI:
         col = event.x // self.cell_size
         row = event.y // self.cell_size
         
+        if self._recall_running:
+            return
         if 0 <= row < self.grid_size and 0 <= col < self.grid_size:
             index = row * self.grid_size + col
             # Toggle cell value
-            self.current_pattern[index] = 1 - self.current_pattern[index]
-            self.update_display()
+            self._own_current_pattern()
+            self.current_pattern[index] ^= 1
+            self.schedule_redraw()
+    
+    def _share_current_pattern(self, pattern):
+        """Show pattern without copying it; edits will copy first"""
+        self.current_pattern = pattern.view()
+        self.current_pattern.flags.writeable = False
+        self._current_is_shared = True
+    
+    def _own_current_pattern(self):
+        """Copy a shared current pattern before it is edited in place"""
+        if self._current_is_shared:
+            self.current_pattern = self.current_pattern.copy()
+            self._current_is_shared = False
+    
+    def schedule_redraw(self):
+        """Request a redraw; repeated requests before it runs are merged"""
+        if self._redraw_pending:
+            return
+        self._redraw_pending = True
+        self.root.after(self.redraw_delay, self._do_redraw)
+    
+    def _do_redraw(self):
+        self._redraw_pending = False
+        self.update_display()
     
     def update_display(self):
         """Update the visual grid display"""
-        self.canvas.delete("all")
-        
-        for i in range(self.grid_size):
-            for j in range(self.grid_size):
-                index = i * self.grid_size + j
-                x1, y1 = j * self.cell_size, i * self.cell_size
-                x2, y2 = x1 + self.cell_size, y1 + self.cell_size
-                
-                # White for 0, Black for 1
-                color = 'black' if self.current_pattern[index] == 1 else 'white'
-                
-                self.canvas.create_rectangle(x1, y1, x2, y2, 
-                                           fill=color, outline='gray')
+        # White for 0, Black for 1
+        colors = np.where(self.current_pattern.reshape(self.grid_size, self.grid_size) == 1,
+                          '#000000', '#ffffff')
+        data = ' '.join('{' + ' '.join(row) + '}' for row in colors)
+        
+        # Write all 64 pixels in one call, then zoom them into the canvas image
+        self.pixels.put(data)
+        self.photo.tk.call(self.photo.name, 'copy', self.pixels.name,
+                           '-zoom', self.cell_size, self.cell_size)
     
     def clear_grid(self):
         """Clear the current pattern"""
-        self.current_pattern = np.zeros(64, dtype=int)
-        self.update_display()
+        if self._recall_running:
+            return
+        self.current_pattern = np.zeros(64, dtype=np.uint8)
+        self._current_is_shared = False
+        self.schedule_redraw()
         self.update_info("Grid cleared.")
     
     def load_pattern(self):
         """Load current pattern into storage"""
+        if self._recall_running:
+            return
         if np.sum(self.current_pattern) == 0:
             messagebox.showwarning("Warning", "Cannot load empty pattern!")
             return
         
-        pattern_copy = self.current_pattern.copy()
-        self.stored_patterns.append(pattern_copy)
+        # vstack copies, so the current pattern can be stored as is
+        self.stored_patterns = np.vstack([self.stored_patterns,
+                                          self.current_pattern[None, :]])
+        with self._network_lock:
+            self.network.add(self.current_pattern)
         
         # Update listbox
         pattern_name = f"Pattern {len(self.stored_patterns)}"
@@ -152,11 +236,14 @@ class HopfieldGUI:
     
     def train_network(self):
         """Train the Hopfield network with stored patterns"""
-        if not self.stored_patterns:
+        if self._recall_running:
+            return
+        if len(self.stored_patterns) == 0:
             messagebox.showwarning("Warning", "No patterns to train on!")
             return
         
-        self.network.train(self.stored_patterns)
+        with self._network_lock:
+            self.network.train(self.stored_patterns)
         
         info_text = f"Network trained on {len(self.stored_patterns)} patterns.\n"
         info_text += "Hebbian learning complete.\n"
@@ -169,24 +256,89 @@ class HopfieldGUI:
         if len(self.stored_patterns) == 0:
             messagebox.showwarning("Warning", "Train the network first!")
             return
+        if self._recall_running:
+            return
         
-        # Recall pattern
-        recalled_pattern, history = self.network.recall(self.current_pattern)
+        # Recall on a background thread so the GUI stays responsive
+        self._recall_running = True
+        worker = threading.Thread(target=self._recall_worker,
+                                  args=(self.current_pattern.copy(),
+                                        self.update_mode_var.get()),
+                                  daemon=True)
+        worker.start()
+        self.root.after(self.poll_delay, self._poll_recall)
+    
+    def _recall_worker(self, pattern, mode):
+        """Run recall off the Tk thread and hand the result back to it"""
+        result = None
+        try:
+            # Energy and nearest pattern are taken under the same lock, so
+            # they match the weights and patterns the recall ran against
+            with self._network_lock:
+                recall_result = self.network.recall(pattern,
+                                                    synchronous=(mode == 'synchronous'),
+                                                    binarized=(mode == 'binarized'))
+                recalled_pattern, history, bipolar, net_input, status = recall_result
+                energy = self.network.energy(recalled_pattern, bipolar, net_input)
+                nearest = self.network.nearest_stored(recalled_pattern)
+            result = (recalled_pattern, history, status, energy, nearest, mode)
+        finally:
+            # Always answer (None on failure) so Recall never stays blocked
+            self._recall_queue.put(result)
+    
+    def _poll_recall(self):
+        """Pick up the worker's result on the Tk thread"""
+        try:
+            result = self._recall_queue.get_nowait()
+        except queue.Empty:
+            self.root.after(self.poll_delay, self._poll_recall)
+            return
+        
+        if result is None:
+            self._recall_running = False
+            self.update_info("Recall failed, see the console for details.")
+            return
+        self._animate_recall(result, 1)
+    
+    def _animate_recall(self, result, frame):
+        """Show the recall history one sweep at a time, then the summary"""
+        recalled_pattern, history, status, energy, nearest, mode = result
+        
+        if frame < len(history):
+            self._share_current_pattern(history[frame])
+            self.schedule_redraw()
+            self.root.after(self.frame_delay, self._animate_recall, result, frame + 1)
+            return
         
         # Update display with recalled pattern
-        self.current_pattern = recalled_pattern.astype(int)
-        self.update_display()
+        self.current_pattern = recalled_pattern
+        self._current_is_shared = False
+        self.schedule_redraw()
+        self._recall_running = False
         
         # Show convergence info
-        info_text = f"Pattern recall complete!\n"
-        info_text += f"Converged in {len(history)-1} iterations.\n"
-        info_text += f"Energy: {self.network.energy(recalled_pattern):.3f}\n"
+        info_text = f"Pattern recall complete ({mode} updates)!\n"
+        if status == 'converged':
+            info_text += f"Converged in {len(history)-1} iterations.\n"
+        elif status == 'cycle':
+            info_text += f"Stopped on a 2-cycle after {len(history)-1} iterations "
+            info_text += "(not a stable pattern).\n"
+        else:
+            info_text += f"Did not converge in {len(history)-1} iterations.\n"
+        info_text += f"Energy: {energy:.3f}\n"
         info_text += f"Final pattern sum: {np.sum(recalled_pattern)}"
         
+        if nearest is not None:
+            nearest_index, distance = nearest
+            info_text += f"\nNearest stored: Pattern {nearest_index + 1} "
+            info_text += f"({distance} bits differ)"
+        
         self.update_info(info_text)
     
     def add_noise(self):
         """Add random noise to current pattern"""
+        if self._recall_running:
+            return
         if np.sum(self.current_pattern) == 0:
             messagebox.showwarning("Warning", "Draw a pattern first!")
             return
@@ -195,40 +347,43 @@ class HopfieldGUI:
         noise_level = 0.15
         num_flips = int(64 * noise_level)
         
-        indices = np.random.choice(64, num_flips, replace=False)
-        for idx in indices:
-            self.current_pattern[idx] = 1 - self.current_pattern[idx]
+        mask = np.zeros(64, dtype=np.uint8)
+        mask[np.random.choice(64, num_flips, replace=False)] = 1
+        self._own_current_pattern()
+        self.current_pattern ^= mask
         
-        self.update_display()
+        self.schedule_redraw()
         self.update_info(f"Added noise: flipped {num_flips} bits")
     
     def load_selected_pattern(self):
         """Load selected pattern from storage"""
+        if self._recall_running:
+            return
         selection = self.pattern_listbox.curselection()
         if not selection:
             messagebox.showwarning("Warning", "Select a pattern first!")
             return
         
         index = selection[0]
-        self.current_pattern = self.stored_patterns[index].copy()
-        self.update_display()
+        self._share_current_pattern(self.stored_patterns[index])
+        self.schedule_redraw()
         self.update_info(f"Loaded pattern {index + 1}")
     
     def delete_selected_pattern(self):
         """Delete selected pattern from storage"""
+        if self._recall_running:
+            return
         selection = self.pattern_listbox.curselection()
         if not selection:
             messagebox.showwarning("Warning", "Select a pattern first!")
             return
         
         index = selection[0]
-        del self.stored_patterns[index]
+        with self._network_lock:
+            self.network.remove(index=index)
+        self.stored_patterns = np.delete(self.stored_patterns, index, axis=0)
         self.pattern_listbox.delete(index)
         
-        # Retrain network if patterns remain
-        if self.stored_patterns:
-            self.network.train(self.stored_patterns)
-        
         self.update_info(f"Deleted pattern {index + 1}")
     
     def update_info(self, text):
@@ -1,65 +1,323 @@
+from collections import OrderedDict
+
 import numpy as np
+from _kernels import recall_sweep, recall_sweep64, recall_sweep_bin
+
+# Byte value -> 8 bipolar lanes (bit k of the byte is lane k)
+_BYTE_TO_BIPOLAR = (
+    2 * np.unpackbits(np.arange(256, dtype=np.uint8)[:, None],
+                      axis=1, bitorder='little').astype(np.int8) - 1
+)
+
+
+def _bits_to_bipolar(mask, size):
+    """
+    Expand a bitmask into a bipolar vector
+    Bit i set <-> state[i] = +1, otherwise -1
+    """
+    mask_bytes = np.frombuffer(mask.to_bytes((size + 7) // 8, 'little'),
+                               dtype=np.uint8)
+    return _BYTE_TO_BIPOLAR[mask_bytes].reshape(-1)[:size]
+
+
+def _bipolar_to_bits(active):
+    """Pack a boolean "neuron is +1" vector into a bitmask"""
+    return int.from_bytes(np.packbits(active, bitorder='little').tobytes(),
+                          'little')
+
 
 class HopfieldNetwork:
+    ENERGY_CACHE_SIZE = 16
+    
     def __init__(self, size):
         """
         Initialize Hopfield Network
         size: number of neurons (64 for 8x8 grid)
         """
         self.size = size
-        self.weights = np.zeros((size, size))
-        self.patterns = []
+        self.weights = np.zeros((size, size), dtype=np.float32)
+        # Exact integer sum of outer products; weights = _W_sum / p, so
+        # add/remove never accumulate rounding error
+        self._W_sum = np.zeros((size, size), dtype=np.int32)
+        self.patterns = np.empty((0, size), dtype=np.uint8)
+        # Bipolar copy of self.patterns, kept in step for Hamming queries
+        self._bipolar = np.empty((0, size), dtype=np.int8)
+        self.weights_bin = None
+        # int8 weights for recall_sweep64, built lazily by _quantized_weights
+        self._weights_q = None
+        self._weights_q_version = None
+        # Recent energies keyed by (pattern bytes, weights version)
+        self._energy_cache = OrderedDict()
+        self._weights_version = 0
+        self._on_weights_changed()
         
     def train(self, patterns):
         """
         Train the network using Hebbian learning rule
-        patterns: list of binary patterns (each pattern is a flattened array)
+        patterns: (p, size) array of binary patterns, one flattened pattern
+        per row (stored as uint8; converted to float32 only for the SGEMM)
         """
-        self.patterns = patterns
-        self.weights = np.zeros((self.size, self.size))
+        self.patterns = np.asarray(patterns, dtype=np.uint8).reshape(-1, self.size)
         
-        for pattern in patterns:
-            # Convert 0s to -1s for bipolar representation
-            bipolar_pattern = 2 * pattern - 1
-            # Hebbian learning: W = sum(xi * xj) for all patterns
-            self.weights += np.outer(bipolar_pattern, bipolar_pattern)
+        # Convert 0s to -1s for bipolar representation
+        self._bipolar = 2 * self.patterns.astype(np.int8) - 1
+        bipolar = self._bipolar.astype(np.float32)
+        # Hebbian learning: W = sum(xi * xj) for all patterns, as one SGEMM
+        # (exact in float32: every entry is an integer no larger than p)
+        self._W_sum = np.rint(bipolar.T @ bipolar).astype(np.int32)
+        
+        self._normalize_weights()
+    
+    def add(self, pattern):
+        """
+        Add one pattern to an already trained network
+        Updates the integer outer-product sum instead of retraining: O(N^2)
+        """
+        bipolar_pattern = 2 * pattern.astype(np.int8) - 1
+        self._W_sum += np.outer(bipolar_pattern, bipolar_pattern)
+        
+        self.patterns = np.vstack([self.patterns, pattern.astype(np.uint8)[None, :]])
+        self._bipolar = np.vstack([self._bipolar, bipolar_pattern[None, :]])
+        self._normalize_weights()
+    
+    def remove(self, pattern=None, index=None):
+        """
+        Remove one stored pattern from the network
+        Updates the integer outer-product sum instead of retraining: O(N^2)
+        index: row of self.patterns to drop, if the caller knows it (keeps
+        the order right when the same pattern is stored twice); otherwise
+        the first row equal to pattern is dropped
+        """
+        if index is None:
+            if pattern is None:
+                raise ValueError("Pass the pattern or its index to remove")
+            matches = np.flatnonzero((self.patterns == pattern).all(axis=1))
+            if len(matches) == 0:
+                raise ValueError("Pattern is not stored in the network")
+            index = matches[0]
+        
+        # Downdate with the stored row itself, never the caller's copy
+        bipolar_pattern = self._bipolar[index]
+        self._W_sum -= np.outer(bipolar_pattern, bipolar_pattern)
+        
+        self.patterns = np.delete(self.patterns, index, axis=0)
+        self._bipolar = np.delete(self._bipolar, index, axis=0)
+        self._normalize_weights()
+    
+    def _normalize_weights(self):
+        """
+        Rebuild weights from _W_sum and the pattern count
+        train, add and remove all go through here, so the same stored
+        patterns always give bit-identical weights however they were reached
+        """
+        num_patterns = len(self.patterns)
+        if num_patterns > 0:
+            self.weights = (self._W_sum / num_patterns).astype(np.float32)
+        else:
+            self.weights = np.zeros((self.size, self.size), dtype=np.float32)
         
         # Set diagonal to zero (no self-connections)
         np.fill_diagonal(self.weights, 0)
         
-        # Normalize by number of patterns
-        if len(patterns) > 0:
-            self.weights /= len(patterns)
+        self._on_weights_changed()
+    
+    def nearest_stored(self, pattern):
+        """
+        Find the stored pattern closest to pattern by Hamming distance
+        Returns (index, distance), or None if nothing is stored
+        """
+        if len(self._bipolar) == 0:
+            return None
+        bipolar = 2 * pattern.astype(np.int8) - 1
+        distances = np.count_nonzero(self._bipolar != bipolar, axis=1)
+        index = int(np.argmin(distances))
+        return index, int(distances[index])
+    
+    def _on_weights_changed(self):
+        """Refresh state derived from the weight matrix"""
+        # Invalidates cached energies
+        self._weights_version += 1
+        
+        # Sign-only weights packed one uint64 per row (bit j <-> W[i, j] >= 0),
+        # used by the binarized recall path; only possible for up to 64 neurons
+        if self.size <= 64:
+            row_bytes = np.zeros((self.size, 8), dtype=np.uint8)
+            packed = np.packbits(self.weights >= 0, axis=1, bitorder='little')
+            row_bytes[:, :packed.shape[1]] = packed
+            self.weights_bin = row_bytes.view('<u8').reshape(-1)
+
+    def _quantized_weights(self):
+        """
+        int8 weights for the specialized 64-neuron kernel, rebuilt only when
+        the weights changed since the last asynchronous recall
+        W * p is exact integers in [-p, p], so for p <= 127 the quantization
+        is lossless (a positive scale never changes the sign of a net input)
+        """
+        if self._weights_q_version != self._weights_version:
+            num_patterns = len(self.patterns)
+            if num_patterns <= 127:
+                scale = num_patterns
+            else:
+                scale = 127 / max(np.abs(self.weights).max(), 1e-12)
+            self._weights_q = np.rint(self.weights * scale).astype(np.int8).reshape(-1)
+            self._weights_q_version = self._weights_version
+        return self._weights_q
     
-    def recall(self, pattern, max_iterations=100):
+    def recall(self, pattern, max_iterations=100, synchronous=True,
+               binarized=False):
         """
-        Recall a pattern using asynchronous updates
-        Returns the recalled pattern and convergence history
+        Recall a pattern
+        synchronous=True updates all neurons at once: every sweep is a single
+        matrix-vector product plus one vectorized sign step, and convergence
+        is tested on a bitmask of the state (bit i set <-> neuron i is +1).
+        Synchronous updates are fine here since the weights are symmetric
+        with a zero diagonal.
+        synchronous=False updates one neuron at a time with the compiled
+        recall_sweep kernel (or the int8 recall_sweep64 Cython kernel when
+        size == 64 and it has been built).
+        binarized=True updates one neuron at a time using only the signs of
+        the weights (weights_bin), so each net input is a single popcount.
+        This approximates the full-precision dynamics and needs size <= 64.
+        Returns the recalled binary pattern, the convergence history (one
+        row per sweep, starting with the input pattern), the
+        final bipolar state and its net input (W @ state), so energy() can
+        reuse them without another matrix-vector product, and a status:
+        'converged' (fixed point), 'cycle' (synchronous updates settled into
+        a period-2 oscillation, so the result is not an attractor) or
+        'max_iterations'
         """
-        # Convert to bipolar
-        state = 2 * pattern - 1
-        history = [pattern.copy()]
+        if binarized:
+            return self._recall_binarized(pattern, max_iterations)
+        if not synchronous:
+            return self._recall_async(pattern, max_iterations)
+        
+        state = np.where(pattern == 1, np.int8(1), np.int8(-1))
+        mask = _bipolar_to_bits(state > 0)
+        prev_mask = None
+        net_input = None
+        status = 'max_iterations'
+        history = np.empty((max_iterations + 1, self.size), dtype=np.uint8)
+        history[0] = pattern
+        steps = 0
         
         for iteration in range(max_iterations):
-            prev_state = state.copy()
+            prev2_mask, prev_mask = prev_mask, mask
+            
+            # Synchronous update (all neurons from the same state)
+            net_input = self.weights @ state.astype(self.weights.dtype)
+            active = net_input >= 0
+            state = np.where(active, np.int8(1), np.int8(-1))
+            mask = _bipolar_to_bits(active)
             
-            # Asynchronous update (update one neuron at a time)
-            for i in range(self.size):
-                net_input = np.dot(self.weights[i], state)
-                state[i] = 1 if net_input >= 0 else -1
+            # Convert back to binary for history
+            history[iteration + 1] = active
+            steps += 1
+            
+            # Check for convergence, or a period-2 cycle which synchronous
+            # updates can fall into
+            if mask == prev_mask:
+                status = 'converged'
+                break
+            if mask == prev2_mask:
+                status = 'cycle'
+                break
+        
+        # net_input belongs to prev_mask; only recompute if we stopped on a
+        # cycle or ran out of iterations
+        if mask != prev_mask:
+            net_input = self.weights @ state.astype(self.weights.dtype)
+        
+        # Return final binary state, history, bipolar state, net input, status
+        return (state > 0).view(np.uint8), history[:steps + 1], state, net_input, status
+    
+    def _recall_async(self, pattern, max_iterations):
+        """Asynchronous recall (update one neuron at a time)"""
+        weights = np.ascontiguousarray(self.weights)
+        if self.size == 64 and recall_sweep64 is not None:
+            sweep, sweep_weights = recall_sweep64, self._quantized_weights()
+        else:
+            sweep, sweep_weights = recall_sweep, weights
+        state = 2 * pattern.astype(np.int8) - 1
+        history = np.empty((max_iterations + 1, self.size), dtype=np.uint8)
+        history[0] = pattern
+        steps = 0
+        
+        status = 'max_iterations'
+        for iteration in range(max_iterations):
+            flipped = sweep(sweep_weights, state)
             
             # Convert back to binary for history
-            binary_state = (state + 1) // 2
-            history.append(binary_state.copy())
+            history[iteration + 1] = state > 0
+            steps += 1
             
-            # Check for convergence
-            if np.array_equal(state, prev_state):
+            # Converged once a full sweep flips nothing, no state copy needed
+            if flipped == 0:
+                status = 'converged'
                 break
         
-        # Return final binary state and history
-        return (state + 1) // 2, history
+        net_input = weights @ state.astype(weights.dtype)
+        return (state > 0).view(np.uint8), history[:steps + 1], state, net_input, status
     
-    def energy(self, pattern):
-        """Calculate the energy of a given pattern"""
-        bipolar = 2 * pattern - 1
-        return -0.5 * np.dot(bipolar, np.dot(self.weights, bipolar))
+    def _recall_binarized(self, pattern, max_iterations):
+        """Asynchronous recall with sign-only weights (popcount per neuron)"""
+        if self.weights_bin is None:
+            raise ValueError("Binarized recall needs at most 64 neurons")
+        
+        valid_bits = np.uint64((1 << self.size) - 1)
+        state_bits = np.uint64(_bipolar_to_bits(pattern == 1))
+        history = np.empty((max_iterations + 1, self.size), dtype=np.uint8)
+        history[0] = pattern
+        steps = 0
+        status = 'max_iterations'
+        
+        for iteration in range(max_iterations):
+            state_bits, flipped = recall_sweep_bin(self.weights_bin, state_bits,
+                                                   valid_bits)
+            # Numba hands uint64 back as a Python int; keep it unsigned
+            state_bits = np.uint64(state_bits)
+            
+            # Convert back to binary for history
+            history[iteration + 1] = _bits_to_bipolar(int(state_bits), self.size) > 0
+            steps += 1
+            
+            if flipped == 0:
+                status = 'converged'
+                break
+        
+        # Energy is still measured against the full-precision weights
+        state = _bits_to_bipolar(int(state_bits), self.size)
+        net_input = self.weights @ state.astype(self.weights.dtype)
+        return (state > 0).view(np.uint8), history[:steps + 1], state, net_input, status
+    
+    def energy(self, pattern, bipolar=None, net_input=None):
+        """
+        Calculate the energy of a given pattern
+        bipolar and net_input (W @ bipolar) can be passed in from recall()
+        to skip recomputing them; the caller is responsible for net_input
+        matching the current weights
+        Energies computed here from the current weights are cached (last
+        ENERGY_CACHE_SIZE), keyed by the state they were computed from, so
+        asking again for an unchanged pattern and network costs no matrix
+        work. Calls that pass net_input (like the GUI's) bypass the cache
+        """
+        if bipolar is None:
+            bipolar = 2 * pattern.astype(np.int8) - 1
+        if net_input is not None:
+            # Not cached: net_input may come from older weights
+            return -0.5 * float(bipolar @ net_input)
+        
+        # Key on the state the value is computed from, not on pattern, in
+        # case the caller's bipolar differs from it
+        key = ((bipolar > 0).tobytes(), self._weights_version)
+        value = self._energy_cache.get(key)
+        if value is not None:
+            self._energy_cache.move_to_end(key)
+            return value
+        
+        net_input = self.weights @ bipolar.astype(self.weights.dtype)
+        value = -0.5 * float(bipolar @ net_input)
+        
+        self._energy_cache[key] = value
+        if len(self._energy_cache) > self.ENERGY_CACHE_SIZE:
+            self._energy_cache.popitem(last=False)
+        return value